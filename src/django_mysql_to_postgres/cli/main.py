@@ -4,22 +4,23 @@ The main Command-Line Interface (CLI) for the application.
 This file orchestrates the analysis and migration process by calling
 the core logic and interacting with the user via prompts.
 """
+import functools
 import json
 import os
 import re
 import sys
-from importlib import import_module
+import time
 from pathlib import Path
 from typing import Optional
 
-import django
-import questionary
 import typer
-from rich import box
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress
-from rich.table import Table
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = typer.Typer(
     name="db-porter",
@@ -27,10 +28,31 @@ app = typer.Typer(
 )
 console = Console()
 
+# Minimum seconds between progress bar description changes.
+PROGRESS_DESCRIPTION_INTERVAL = 0.05
+
+# Number of characters of manage.py searched before reading the whole file.
+MANAGE_PY_HEAD_SIZE = 4096
+
+_SETTINGS_MODULE_RE = re.compile(
+    r"os\.environ\.setdefault\(\s*['\"]DJANGO_SETTINGS_MODULE['\"]\s*,\s*['\"](.*?)['\"]\s*\)"
+)
+
 
 def _find_django_project_root() -> Optional[Path]:
-    """Searches upward from the current directory to find a 'manage.py' file."""
-    current_dir = Path.cwd()
+    """
+    Searches upward from the current directory to find a 'manage.py' file.
+
+    The working directory is already absolute and free of symlinks, so the
+    result needs no further resolve().
+    """
+    return _find_manage_py_dir(Path.cwd())
+
+
+@functools.lru_cache(maxsize=None)
+def _find_manage_py_dir(start_dir: Path) -> Optional[Path]:
+    """Walks up from start_dir to the first directory holding 'manage.py'."""
+    current_dir = start_dir
     for _ in range(10):
         if (current_dir / "manage.py").exists():
             return current_dir
@@ -40,6 +62,7 @@ def _find_django_project_root() -> Optional[Path]:
     return None
 
 
+@functools.lru_cache(maxsize=8)
 def _get_settings_module_path(project_path: str) -> str:
     """Reads manage.py to find the project's settings module path."""
     manage_py_path = Path(project_path) / "manage.py"
@@ -50,11 +73,13 @@ def _get_settings_module_path(project_path: str) -> str:
 
     try:
         with open(manage_py_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            match = re.search(
-                r"os\.environ\.setdefault\(\s*['\"]DJANGO_SETTINGS_MODULE['\"]\s*,\s*['\"](.*?)['\"]\s*\)",
-                content,
-            )
+            # The setting sits near the top of a standard manage.py; only
+            # read the rest of the file if the head doesn't contain it.
+            content = f.read(MANAGE_PY_HEAD_SIZE)
+            match = _SETTINGS_MODULE_RE.search(content)
+            if not match:
+                content += f.read()
+                match = _SETTINGS_MODULE_RE.search(content)
             if match:
                 return match.group(1)
     except Exception as e:
@@ -67,18 +92,24 @@ def _get_settings_module_path(project_path: str) -> str:
     raise typer.Exit(1)
 
 
-def _setup_django(project_path: str, settings_module: str, db_config: Optional[dict] = None):
-    """Dynamically configures the Django environment."""
+def _point_to_settings(project_path: str, settings_module: str):
+    """Makes the project's settings importable without setting up Django."""
     project_dir = Path(project_path).resolve()
     if str(project_dir) not in sys.path:
         sys.path.append(str(project_dir))
 
     os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
 
+
+def _setup_django(project_path: str, settings_module: str, db_config: Optional[dict] = None):
+    """Dynamically configures the Django environment."""
+    _point_to_settings(project_path, settings_module)
+
     if db_config:
         from django.conf import settings
         settings.DATABASES = db_config
 
+    import django
     try:
         django.setup()
         console.print(
@@ -88,6 +119,50 @@ def _setup_django(project_path: str, settings_module: str, db_config: Optional[d
         raise typer.Exit(1)
 
 
+def _with_streaming_cursor(db_config: dict) -> dict:
+    """
+    Returns a copy of a MySQL database config that uses mysqlclient's
+    server-side cursor, so query results are streamed instead of being
+    buffered in memory.
+
+    While such a cursor is being read, no other query can run on the same
+    connection. Configs for other engines or drivers are returned unchanged.
+    """
+    if db_config.get("ENGINE") != "django.db.backends.mysql":
+        return db_config
+    try:
+        from MySQLdb.cursors import SSCursor
+    except ImportError:
+        return db_config
+
+    options = {**db_config.get("OPTIONS", {}), "cursorclass": SSCursor}
+    return {**db_config, "OPTIONS": options}
+
+
+def _write_plan_json(f, grouped_order: list, m2m_through_models: list):
+    """
+    Writes the machine-readable plan read by `migrate`, streaming the model
+    labels straight from the grouped order instead of building flattened
+    copies of it first.
+    """
+    f.write('{"migration_order":[')
+    first = True
+    for group in grouped_order:
+        for item in group:
+            if not first:
+                f.write(",")
+            f.write(json.dumps(item['model']))
+            first = False
+    f.write('],"migration_groups":[')
+    for i, group in enumerate(grouped_order):
+        if i:
+            f.write(",")
+        f.write("[" + ",".join(json.dumps(item['model']) for item in group) + "]")
+    f.write('],"m2m_through_models":')
+    json.dump(m2m_through_models, f, separators=(",", ":"))
+    f.write("}")
+
+
 @app.command()
 def analyze(
     project_path: Optional[str] = typer.Option(
@@ -109,7 +184,7 @@ def analyze(
             "--> Project path not provided. Searching for 'manage.py'...")
         found_path = _find_django_project_root()
         if found_path:
-            project_path = str(found_path.resolve())
+            project_path = str(found_path)
             console.print(
                 f"[bold green]✔ Django project found at:[/bold green] [cyan]{project_path}[/cyan]")
         else:
@@ -122,52 +197,48 @@ def analyze(
 
     try:
         plan = generate_migration_plan(ignore_cycles=ignore_cycles)
+        warnings = plan["warnings"]
 
-        if plan.get("warnings"):
+        if warnings:
             console.print(
-                "\n[bold yellow]Warnings generated during analysis:[/bold yellow]")
-            for warning in plan["warnings"]:
-                console.print(f"- {warning}")
+                "\n[bold yellow]Warnings generated during analysis:[/bold yellow]\n"
+                + "\n".join(f"- {warning}" for warning in warnings))
+
+        parts = [
+            "# Migration Plan (Auto-Generated)\n\n",
+            "This plan was generated by `db-porter`.\n",
+            "Models are grouped by dependency levels for a safe migration order.\n\n",
+        ]
+
+        if warnings:
+            parts.append("## ⚠️ Warnings\n\n")
+            for warning in warnings:
+                parts.append(f"- **{warning}**\n")
+            parts.append(
+                "\n_The migration will proceed, but the order for cyclical models is not guaranteed._\n\n")
+
+        grouped_order = plan.get("grouped_migration_order", [])
+        for i, group in enumerate(grouped_order, 1):
+            parts.append(f"### Group {i}\n\nThese models can be migrated now.\n\n")
+            for item in group:
+                model_label = item['model']
+                dependencies = item['dependencies']
+                comment = f"  # Depends on: {', '.join(dependencies)}" if dependencies else ""
+                parts.append(f"- `{model_label}`{comment}\n")
+            parts.append("\n")
 
         plan_md_path = Path("migration_plan.md")
         with open(plan_md_path, "w", encoding="utf-8") as f:
-            f.write("# Migration Plan (Auto-Generated)\n\n")
-            f.write("This plan was generated by `db-porter`.\n")
-            f.write(
-                "Models are grouped by dependency levels for a safe migration order.\n\n")
-
-            if plan.get("warnings"):
-                f.write("## ⚠️ Warnings\n\n")
-                for warning in plan["warnings"]:
-                    f.write(f"- **{warning}**\n")
-                f.write(
-                    "\n_The migration will proceed, but the order for cyclical models is not guaranteed._\n\n")
-
-            grouped_order = plan.get("grouped_migration_order", [])
-            flat_order_for_json = []
-            for i, group in enumerate(grouped_order, 1):
-                f.write(f"### Group {i}\n\n")
-                f.write("These models can be migrated now.\n\n")
-                for item in group:
-                    model_label = item['model']
-                    flat_order_for_json.append(model_label)
-                    dependencies = item['dependencies']
-                    comment = f"  # Depends on: {', '.join(dependencies)}" if dependencies else ""
-                    f.write(f"- `{model_label}`{comment}\n")
-                f.write("\n")
+            f.write("".join(parts))
 
         plan_json_path = Path("migration_plan.json")
         with open(plan_json_path, "w") as f:
-            simple_plan = {
-                "migration_order": flat_order_for_json,
-                "m2m_through_models": plan.get("m2m_through_models", [])
-            }
-            json.dump(simple_plan, f, indent=2)
+            _write_plan_json(f, grouped_order, plan.get("m2m_through_models", []))
 
         console.print(
-            f"\n[bold green]✔ Analysis complete! Plan saved to:[/bold green]")
-        console.print(f"- [cyan]{plan_md_path.resolve()}[/cyan]")
-        console.print(f"- [cyan]{plan_json_path.resolve()}[/cyan]")
+            "\n[bold green]✔ Analysis complete! Plan saved to:[/bold green]\n"
+            f"- [cyan]{plan_md_path.resolve()}[/cyan]\n"
+            f"- [cyan]{plan_json_path.resolve()}[/cyan]")
 
     except CircularDependencyError as e:
         console.print(f"\n[bold red]Error: {e}[/bold red]")
@@ -185,10 +256,33 @@ def migrate(
     plan_file: Path = typer.Option(
         "migration_plan.json", "--plan", help="Path to the migration plan."),
     project_path: Optional[str] = typer.Option(
-        None, "--path", "-p", help="Path to your Django project.")
+        None, "--path", "-p", help="Path to your Django project."),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", min=1,
+        help="Maximum number of models migrated in parallel. Defaults to the CPU count."),
+    unlogged_during_load: bool = typer.Option(
+        False, "--unlogged-during-load",
+        help="Make destination tables UNLOGGED while loading data. Faster, but briefly breaks standby replication."),
+    drop_indexes_during_load: bool = typer.Option(
+        False, "--drop-indexes-during-load",
+        help="Drop secondary indexes while loading data and rebuild them afterwards. Their definitions are saved next to the plan."),
+    insert_mode: str = typer.Option(
+        "copy", "--insert-mode",
+        help="How rows are written: copy, execute_values or execute_batch. Use the latter two where COPY is not allowed.")
 ):
+    # Imported here so `--help` and `analyze` don't pay for them.
+    import questionary
+    from rich import box
+    from rich.progress import Progress
+    from rich.table import Table
+
     from django_mysql_to_postgres.cli.prompts import ask_for_db_credentials
-    from django_mysql_to_postgres.logic.migration import execute_migration
+    from django_mysql_to_postgres.logic.migration import INSERT_MODES, execute_migration
+
+    if insert_mode not in INSERT_MODES:
+        console.print(
+            f"[bold red]Error: Invalid insert mode '{insert_mode}'. Choose one of: {', '.join(INSERT_MODES)}.[/bold red]")
+        raise typer.Exit(1)
 
     console.print(
         Panel.fit("[bold magenta]Step 2: Executing Data Migration[/bold magenta]"))
@@ -197,27 +291,33 @@ def migrate(
         console.print(
             f"[bold red]Error: Plan file '{plan_file}' not found. Run 'analyze' first.[/bold red]")
         raise typer.Exit(1)
-    with open(plan_file, "r") as f:
-        plan = json.load(f)
+    index_backup_path = plan_file.with_name("dropped_indexes.sql")
+    if drop_indexes_during_load and index_backup_path.exists():
+        console.print(
+            f"[bold red]Error: '{index_backup_path}' lists indexes from a previous run that were not recreated. Run it manually and delete it before using --drop-indexes-during-load again.[/bold red]")
+        raise typer.Exit(1)
+    with open(plan_file, "rb") as f:
+        plan = orjson.loads(f.read()) if orjson else json.load(f)
 
     if not project_path:
         found_path = _find_django_project_root()
         if found_path:
-            project_path = str(found_path.resolve())
+            project_path = str(found_path)
         else:
             console.print(
                 "[bold red]Error: Could not auto-detect project root. Please provide the path using --path.[/bold red]")
             raise typer.Exit(1)
 
     settings_module_path = _get_settings_module_path(project_path)
-    temp_sys_path = False
-    if project_path not in sys.path:
-        sys.path.insert(0, project_path)
-        temp_sys_path = True
-    user_settings = import_module(settings_module_path)
-    source_creds = user_settings.DATABASES['default']
-    if temp_sys_path:
-        sys.path.pop(0)
+    # Only the settings module is loaded here; the app registry is set up
+    # once, below, with the final database configuration.
+    _point_to_settings(project_path, settings_module_path)
+    from django.conf import settings
+    try:
+        source_creds = settings.DATABASES['default']
+    except ImportError as e:
+        console.print(f"[bold red]Error loading project settings: {e}[/bold red]")
+        raise typer.Exit(1)
 
     console.print(
         "[green]✔ Source database (MySQL) detected from project settings.[/green] \n")
@@ -245,24 +345,40 @@ def migrate(
 
     migration_db_config = {
         "default": dest_creds,
-        "source": source_creds,
+        "source": _with_streaming_cursor(source_creds),
     }
 
     _setup_django(project_path, settings_module_path,
                   db_config=migration_db_config)
 
     with Progress() as progress:
-        task = progress.add_task(
-            "[cyan]Migrating...", total=len(plan["migration_order"]))
+        total_models = len(dict.fromkeys(plan["migration_order"]))
+        task = progress.add_task("[cyan]Migrating...", total=total_models)
+
+        last_description_update = [0.0]
 
         def progress_callback(level, message):
-            if "Migrating" in message and "\n" in message:
-                progress.update(task, advance=1, description=message.strip())
-            elif level in ("ERROR", "WARNING"):
+            if level in ("ERROR", "WARNING"):
                 progress.console.print(f"[{level.lower()}]{message}[/]")
+            elif "Migrating" in message and "\n" in message:
+                # Every model advances the bar, but the description only
+                # changes a few times per second when many tables are small.
+                now = time.monotonic()
+                if now - last_description_update[0] < PROGRESS_DESCRIPTION_INTERVAL:
+                    progress.advance(task)
+                    return
+                last_description_update[0] = now
+                progress.update(task, advance=1, description=message.strip())
 
         try:
-            execute_migration(plan, "source", "default", progress_callback)
+            execute_migration(plan, "source", "default", progress_callback,
+                              max_workers=workers, unlogged=unlogged_during_load,
+                              insert_mode=insert_mode,
+                              drop_indexes=drop_indexes_during_load,
+                              index_backup_path=str(index_backup_path))
+            # Proxy models share their table and are not migrated on their
+            # own, so they never advance the bar.
+            progress.update(task, completed=total_models)
         except Exception as e:
             console.print(f"\n[bold red]Migration failed: {e}[/bold red]")
             raise typer.Exit(1)
@@ -2,16 +2,11 @@
 """
 Core logic for analyzing a Django project's model dependencies with grouping.
 """
-from collections import defaultdict
-from typing import Dict, List, Set, Type, Any
+from collections import deque
+from typing import Deque, Dict, List, Set, Type, Any
 
 from django.apps import apps
 from django.db.models import Model
-from django.db.models.fields.related import (
-    ForeignKey,
-    ManyToManyField,
-    OneToOneField,
-)
 
 
 class CircularDependencyError(Exception):
@@ -33,74 +28,85 @@ def generate_migration_plan(ignore_cycles: bool = False) -> Dict[str, Any]:
         A dictionary containing the structured migration plan.
     """
     all_models: List[Type[Model]] = apps.get_models()
-    model_map: Dict[Type[Model], str] = {
-        model: f"{model._meta.app_label}.{model._meta.object_name}"
-        for model in all_models
+    # Models are handled by their position in all_models so the graph can be
+    # kept in plain lists instead of dicts keyed by model class.
+    model_index: Dict[Type[Model], int] = {
+        model: i for i, model in enumerate(all_models)
     }
+    labels: List[str] = [model._meta.label for model in all_models]
 
     # Forward and reverse dependency graphs
-    dependents_graph: Dict[Type[Model], Set[Type[Model]]] = defaultdict(set)
-    dependencies_graph: Dict[Type[Model], Set[str]] = defaultdict(set)
-    in_degree: Dict[Type[Model], int] = defaultdict(int)
-
-    for model in all_models:
-        if model not in in_degree:
-            in_degree[model] = 0
-        for field in model._meta.get_fields():
-            if isinstance(field, (ForeignKey, OneToOneField)):
-                related_model = field.related_model
-                if related_model and related_model in all_models:
-                    dependents_graph[related_model].add(model)
-                    dependencies_graph[model].add(model_map[related_model])
-                    in_degree[model] += 1
+    dependents_graph: List[List[int]] = [[] for _ in all_models]
+    dependencies_graph: List[Set[str]] = [set() for _ in all_models]
+    in_degree: List[int] = [0] * len(all_models)
+
+    for i, model in enumerate(all_models):
+        # Local fields are the columns of the model's own table: reverse and
+        # M2M relations are never visited, nor are the fields a multi-table
+        # child inherits from its parent's table.
+        for field in model._meta.local_fields:
+            if field.is_relation and (field.many_to_one or field.one_to_one):
+                related_index = model_index.get(field.related_model)
+                if related_index is None:
+                    continue
+                related_label = labels[related_index]
+                # Several FKs to the same model still make a single edge.
+                if related_label in dependencies_graph[i]:
+                    continue
+                dependents_graph[related_index].append(i)
+                dependencies_graph[i].add(related_label)
+                in_degree[i] += 1
 
     # Kahn's algorithm modified to produce groups (levels)
-    queue: List[Type[Model]] = [
-        model for model in all_models if in_degree[model] == 0
-    ]
+    queue: Deque[int] = deque(
+        i for i, degree in enumerate(in_degree) if degree == 0
+    )
     sorted_groups: List[Dict[str, Any]] = []
-    processed_count = 0
+    remaining: Set[int] = set(range(len(all_models)))
 
     while queue:
         # The current queue represents a whole level of models that can be migrated
-        current_level_models = sorted(queue, key=lambda m: model_map[m])
+        current_level = sorted(
+            (queue.popleft() for _ in range(len(queue))), key=labels.__getitem__)
         group_details = []
-        for model in current_level_models:
+        for i in current_level:
             group_details.append({
-                "model": model_map[model],
-                "dependencies": sorted(list(dependencies_graph.get(model, [])))
+                "model": labels[i],
+                "dependencies": sorted(dependencies_graph[i])
             })
 
         sorted_groups.append(group_details)
-        processed_count += len(current_level_models)
-
-        next_queue = []
-        for model in current_level_models:
-            for dependent_model in sorted(dependents_graph[model], key=lambda m: model_map[m]):
-                in_degree[dependent_model] -= 1
-                if in_degree[dependent_model] == 0:
-                    next_queue.append(dependent_model)
-        queue = next_queue
-
-    warnings = []
-    if processed_count != len(all_models):
-        unsorted_models = {m for m in all_models if in_degree[m] > 0}
-        unsorted_labels = ", ".join(model_map[m] for m in unsorted_models)
-
-        if not ignore_cycles:
-            raise CircularDependencyError(
-                f"Circular dependency detected. Unsorted models: {unsorted_labels}")
-        else:
-            warnings.append(
-                f"Circular dependency detected and ignored. The following models have an unpredictable order: {unsorted_labels}")
-            # Add the cyclical models as a final group
-            cyclical_group_details = []
-            for model in sorted(unsorted_models, key=lambda m: model_map[m]):
-                cyclical_group_details.append({
-                    "model": model_map[model],
-                    "dependencies": sorted(list(dependencies_graph.get(model, [])))
-                })
-            sorted_groups.append(cyclical_group_details)
+        remaining.difference_update(current_level)
+
+        # Newly ready dependents form the next level; it is sorted when popped.
+        for i in current_level:
+            for dependent in dependents_graph[i]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+
+    if not remaining:
+        return {"grouped_migration_order": sorted_groups, "warnings": []}
+
+    # Whatever Kahn's algorithm couldn't release is part of a cycle.
+    unsorted_models = sorted(remaining, key=labels.__getitem__)
+    unsorted_labels = ", ".join(labels[i] for i in unsorted_models)
+
+    if not ignore_cycles:
+        raise CircularDependencyError(
+            f"Circular dependency detected. Unsorted models: {unsorted_labels}")
+
+    warnings = [
+        f"Circular dependency detected and ignored. The following models have an unpredictable order: {unsorted_labels}"
+    ]
+    # Add the cyclical models as a final group
+    cyclical_group_details = []
+    for i in unsorted_models:
+        cyclical_group_details.append({
+            "model": labels[i],
+            "dependencies": sorted(dependencies_graph[i])
+        })
+    sorted_groups.append(cyclical_group_details)
 
     plan = {
         "grouped_migration_order": sorted_groups,
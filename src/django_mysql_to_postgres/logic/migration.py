@@ -2,146 +2,640 @@
 """
 Core logic for executing the data migration between two databases.
 """
-from typing import Callable, Dict, List, Optional
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 from django.apps import apps
-from django.db import connections, models
+from django.db import connections, models, transaction
 
 try:
     from psycopg2 import errors as psycopg2_errors
+    from psycopg2 import extensions as psycopg2_extensions
+    from psycopg2 import extras as psycopg2_extras
     UNDEFINED_TABLE_ERROR = psycopg2_errors.UndefinedTable
 except ImportError:
+    psycopg2_extras = None
     UNDEFINED_TABLE_ERROR = Exception
 
+# Number of rows fetched from the source per round-trip.
+FETCH_CHUNK_SIZE = 10000
+# Rows per statement (execute_values) or per round-trip (execute_batch).
+INSERT_PAGE_SIZE = 1000
+
+# Ways of writing rows to the destination, fastest first.
+INSERT_MODES = ("copy", "execute_values", "execute_batch")
+
 
 def _default_callback(level: str, message: str):
     """A no-op callback function."""
     pass
 
 
+def _render_copy_value(value: Any) -> Optional[str]:
+    """Renders a database-prepared value as PostgreSQL COPY text."""
+    if value is None:
+        return None
+    if psycopg2_extras is not None:
+        # Unwrap the adapters Django's PostgreSQL backend returns for JSON
+        # and binary values.
+        if isinstance(value, psycopg2_extras.Json):
+            return value.dumps(value.adapted)
+        if isinstance(value, psycopg2_extensions.Binary):
+            value = value.adapted
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, datetime.timedelta):
+        # Same form psycopg2 uses; PostgreSQL rejects negative ISO 8601
+        # durations such as "-P1DT...".
+        return f"{value.days} days {value.seconds}.{value.microseconds:06d} seconds"
+    return str(value)
+
+
+def _get_copy_converter(field: models.Field, connection) -> Callable[[Any], Optional[str]]:
+    """
+    Returns a function that renders a field value as PostgreSQL COPY text,
+    after preparing it with the field's ``get_db_prep_save`` like an INSERT
+    would, so custom fields are written in their database form.
+    """
+    prep_value = field.get_db_prep_save
+    return lambda value: _render_copy_value(prep_value(value, connection))
+
+
+class _CopyStream:
+    """
+    A read-only file-like object that renders rows as CSV lines on demand,
+    so COPY can consume a source queryset without materializing it.
+
+    NULL is written as an unquoted empty field and every other value is
+    quoted, which is unambiguous for PostgreSQL's CSV format.
+    """
+
+    def __init__(self, rows: Iterable[tuple], converters: List[Callable[[Any], Optional[str]]]):
+        self.row_count = 0
+        self._lines = self._render(rows, converters)
+        self._buffer = ""
+
+    def _render(self, rows, converters) -> Iterator[str]:
+        for row in rows:
+            self.row_count += 1
+            texts = (
+                None if value is None else convert(value)
+                for convert, value in zip(converters, row)
+            )
+            yield ",".join(
+                "" if text is None else '"' + text.replace('"', '""') + '"'
+                for text in texts
+            ) + "\n"
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def _fetch_source_rows(model: Type[models.Model], source_db_alias: str) -> Iterator[tuple]:
+    """Streams the concrete column values of every source row as tuples."""
+    # Plain tuples skip model instantiation, and clearing Meta.ordering
+    # spares the source a sort the copy doesn't need.
+    return model.objects.using(source_db_alias).order_by().values_list(
+        *[field.attname for field in model._meta.local_concrete_fields]
+    ).iterator(chunk_size=FETCH_CHUNK_SIZE)
+
+
+def _copy_model_data(cursor, model: Type[models.Model], source_db_alias: str) -> int:
+    """
+    Streams all rows of a model from the source database into the destination
+    table using COPY FROM STDIN.
+
+    Returns:
+        The number of rows copied.
+    """
+    fields = model._meta.local_concrete_fields
+    quote_name = cursor.db.ops.quote_name
+    stream = _CopyStream(
+        _fetch_source_rows(model, source_db_alias),
+        [_get_copy_converter(field, cursor.db) for field in fields],
+    )
+
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    cursor.copy_expert(
+        f"COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)",
+        stream,
+    )
+    return stream.row_count
+
+
+def _insert_model_data(
+    cursor, model: Type[models.Model], source_db_alias: str, insert_mode: str
+) -> int:
+    """
+    Streams all rows of a model from the source database into the destination
+    table with multi-row INSERTs, for connections where COPY is unavailable.
+
+    Uses psycopg2's ``execute_values``/``execute_batch`` when the driver is
+    psycopg2, and the driver's own ``executemany`` otherwise.
+
+    Returns:
+        The number of rows inserted.
+    """
+    fields = model._meta.local_concrete_fields
+    connection = cursor.db
+    quote_name = connection.ops.quote_name
+    prep_values = [field.get_db_prep_save for field in fields]
+    row_count = 0
+
+    def prepared_rows():
+        nonlocal row_count
+        for row in _fetch_source_rows(model, source_db_alias):
+            row_count += 1
+            yield tuple(
+                prep_value(value, connection)
+                for prep_value, value in zip(prep_values, row)
+            )
+
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    sql = f"INSERT INTO {quote_name(model._meta.db_table)} ({columns}) VALUES "
+    raw_cursor = cursor.cursor
+    is_psycopg2 = psycopg2_extras is not None and isinstance(
+        raw_cursor, psycopg2_extensions.cursor)
+    if is_psycopg2 and insert_mode == "execute_values":
+        psycopg2_extras.execute_values(
+            raw_cursor, sql + "%s", prepared_rows(), page_size=INSERT_PAGE_SIZE)
+    elif is_psycopg2:
+        psycopg2_extras.execute_batch(
+            raw_cursor, sql + f"({', '.join(['%s'] * len(fields))})",
+            prepared_rows(), page_size=INSERT_PAGE_SIZE)
+    else:
+        raw_cursor.executemany(
+            sql + f"({', '.join(['%s'] * len(fields))})", prepared_rows())
+    return row_count
+
+
+def _load_model_data(
+    cursor, model: Type[models.Model], source_db_alias: str, insert_mode: str
+) -> int:
+    """
+    Loads a model's rows with COPY, falling back to INSERTs when another
+    insert mode is requested or the driver's cursor has no ``copy_expert``.
+    """
+    if insert_mode == "copy" and hasattr(cursor, "copy_expert"):
+        return _copy_model_data(cursor, model, source_db_alias)
+    return _insert_model_data(cursor, model, source_db_alias, insert_mode)
+
+
+def _resolve_models(model_labels: List[str]) -> List[Tuple[str, Type[models.Model], str, str, bool]]:
+    """
+    Looks up each model once and returns ``(label, model, table, pk_column,
+    is_auto_pk)`` tuples so the migration phases don't repeat registry
+    lookups and ``_meta`` attribute chains.
+    """
+    resolved = []
+    for model_label in model_labels:
+        model = apps.get_model(model_label)
+        pk = model._meta.pk
+        resolved.append((
+            model_label,
+            model,
+            model._meta.db_table,
+            pk.column,
+            isinstance(pk, (models.AutoField, models.BigAutoField)),
+        ))
+    return resolved
+
+
+def _get_shared_table_labels(model_labels: List[str]) -> List[str]:
+    """
+    Returns the labels whose table is loaded by another label: proxy models,
+    and any model whose table an earlier label already writes to. Loading
+    them as well would copy the same rows into the same table twice.
+    """
+    shared = []
+    seen_tables = set()
+    for model_label in model_labels:
+        model = apps.get_model(model_label)
+        if model._meta.proxy or model._meta.db_table in seen_tables:
+            shared.append(model_label)
+        else:
+            seen_tables.add(model._meta.db_table)
+    return shared
+
+
+def _dedupe_groups(groups: List[List[str]]) -> List[List[str]]:
+    """Keeps only the first occurrence of each label across all groups."""
+    seen = set()
+    deduped = []
+    for group in groups:
+        deduped_group = []
+        for model_label in group:
+            if model_label not in seen:
+                seen.add(model_label)
+                deduped_group.append(model_label)
+        if deduped_group:
+            deduped.append(deduped_group)
+    return deduped
+
+
+def _align_groups(
+    groups: List[List[str]], migration_order: List[str]
+) -> Tuple[List[List[str]], List[str], List[str]]:
+    """
+    Restricts ``groups`` to the labels in ``migration_order`` and appends the
+    labels no group lists as a final group, so every cleaned table is loaded
+    again and nothing outside the plan's order is copied.
+
+    Returns the aligned groups, the dropped labels and the appended labels.
+    """
+    planned = set(migration_order)
+    aligned = []
+    unknown = []
+    for group in groups:
+        unknown.extend(model_label for model_label in group if model_label not in planned)
+        aligned_group = [model_label for model_label in group if model_label in planned]
+        if aligned_group:
+            aligned.append(aligned_group)
+    grouped = {model_label for group in aligned for model_label in group}
+    missing = [model_label for model_label in migration_order if model_label not in grouped]
+    if missing:
+        aligned.append(missing)
+    return aligned, unknown, missing
+
+
+def _get_m2m_through_labels(
+    migrated_models: List[Type[models.Model]],
+    extra_labels: List[str],
+) -> List[str]:
+    """
+    Collects the through tables of the migrated models' ManyToMany fields,
+    each once, skipping custom through models already migrated as regular
+    models.
+
+    Only forward fields are visited, so a relation reachable from both of
+    its ends (or a symmetrical one) yields a single through table.
+    """
+    seen = {model._meta.label for model in migrated_models}
+    through_labels = []
+    for model in migrated_models:
+        for field in model._meta.local_many_to_many:
+            through_label = field.remote_field.through._meta.label
+            if through_label not in seen:
+                seen.add(through_label)
+                through_labels.append(through_label)
+    for model_label in extra_labels:
+        if model_label not in seen:
+            seen.add(model_label)
+            through_labels.append(model_label)
+    return through_labels
+
+
+def _drop_secondary_indexes(
+    cursor,
+    table_names: List[str],
+    dropped: List[str],
+    backup_path: Optional[str] = None,
+):
+    """
+    Drops the plain (non-unique, non-constraint) indexes of the given tables
+    so the bulk load doesn't maintain them row by row.
+
+    The ``CREATE INDEX`` statement of each index is appended to ``dropped``
+    as soon as it is dropped, so a failure part way through still leaves the
+    caller what it needs to rebuild it. With ``backup_path`` set, each
+    statement is also written to that file before its index is dropped.
+    """
+    cursor.execute(
+        """
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE t.relname = ANY(%s)
+          AND n.nspname = ANY(current_schemas(false))
+          AND NOT i.indisprimary
+          AND NOT i.indisunique
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid
+          )
+        """,
+        [list(table_names)],
+    )
+    indexes = cursor.fetchall()
+    if not indexes:
+        return
+    backup_file = open(backup_path, "w", encoding="utf-8") if backup_path else None
+    try:
+        for index_name, index_definition in indexes:
+            if backup_file:
+                backup_file.write(f"{index_definition};\n")
+                backup_file.flush()
+            cursor.execute(f"DROP INDEX {index_name};")
+            dropped.append(index_definition)
+    finally:
+        if backup_file:
+            backup_file.close()
+
+
+def _recreate_indexes(
+    cursor, index_definitions: List[str], callback: Callable[[str, str], None]
+) -> List[str]:
+    """
+    Rebuilds indexes dropped by ``_drop_secondary_indexes``.
+
+    Returns:
+        The statements that failed and must be run manually.
+    """
+    failed = []
+    for index_definition in index_definitions:
+        try:
+            cursor.execute(index_definition)
+        except Exception as e:
+            failed.append(index_definition)
+            callback(
+                "ERROR", f"Could not recreate index, run it manually: {index_definition} ({e})")
+    return failed
+
+
+def _set_tables_logged(
+    cursor,
+    table_names: List[str],
+    logged: bool,
+    callback: Callable[[str, str], None],
+) -> List[str]:
+    """
+    Switches tables between LOGGED and UNLOGGED, skipping those that can't be
+    changed (e.g. missing, or still referenced by a table in the other mode).
+
+    Returns:
+        The names of the tables that were changed.
+    """
+    mode = "LOGGED" if logged else "UNLOGGED"
+    changed = []
+    for table_name in table_names:
+        try:
+            cursor.execute(f'ALTER TABLE "{table_name}" SET {mode};')
+            changed.append(table_name)
+        except Exception as e:
+            callback(
+                "WARNING", f"Could not set table '{table_name}' {mode}: {e}")
+    return changed
+
+
+def _migrate_model(
+    model: Type[models.Model],
+    source_db_alias: str,
+    destination_db_alias: str,
+    callback: Callable[[str, str], None],
+    insert_mode: str = "copy",
+):
+    """
+    Copies the data of a single model on the calling thread's own connections.
+
+    Django connections are thread-local, so each worker gets a separate
+    destination session and must disable triggers on it itself.
+    """
+    model_label = model._meta.label
+    callback("INFO", f"\nMigrating {model._meta.verbose_name_plural}...")
+    try:
+        with connections[destination_db_alias].cursor() as cursor:
+            cursor.execute("SET session_replication_role = 'replica';")
+            # Rows are copied as raw column values, so auto_now/auto_now_add
+            # never fire and the original timestamps are preserved.
+            try:
+                # One transaction per model: constraint checks and the commit
+                # happen once, and the commit doesn't wait for the WAL flush.
+                with transaction.atomic(using=destination_db_alias):
+                    cursor.execute("SET LOCAL synchronous_commit = OFF;")
+                    cursor.execute("SET CONSTRAINTS ALL DEFERRED;")
+                    count = _load_model_data(
+                        cursor, model, source_db_alias, insert_mode)
+
+                if count == 0:
+                    callback("INFO", "No items to migrate.")
+                else:
+                    callback("SUCCESS", f"Success: {count} items migrated.")
+            except Exception as e:
+                if ("1146" in str(e)) or ("UndefinedTable" in str(e.__class__.__name__)):
+                    callback(
+                        "WARNING", f"Table for '{model_label}' not found. Skipping.")
+                else:
+                    callback(
+                        "ERROR", f"Error during data migration for {model_label}: {e}")
+                    raise
+            finally:
+                cursor.execute("SET session_replication_role = 'origin';")
+    finally:
+        connections[source_db_alias].close()
+        connections[destination_db_alias].close()
+
+
 def execute_migration(
     plan: Dict[str, List[str]],
     source_db_alias: str,
     destination_db_alias: str,
     progress_callback: Optional[Callable[[str, str], None]] = None,
+    max_workers: Optional[int] = None,
+    unlogged: bool = False,
+    insert_mode: str = "copy",
+    drop_indexes: bool = False,
+    index_backup_path: Optional[str] = None,
 ):
     """
     Executes the full data migration process based on the provided plan.
+
+    Models in the same group of ``migration_groups`` do not depend on each
+    other and are copied concurrently by up to ``max_workers`` threads
+    (defaults to the CPU count). Plans without groups are migrated serially.
+
+    With ``unlogged`` set, the destination tables skip the write-ahead log
+    while the data is loaded and are made durable again afterwards.
+
+    Rows are written with COPY unless ``insert_mode`` selects one of the
+    INSERT-based fallbacks in ``INSERT_MODES``.
+
+    With ``drop_indexes`` set, plain secondary indexes are dropped during the
+    load and rebuilt afterwards. Their definitions are saved to
+    ``index_backup_path``, if given, which is removed once every index has
+    been rebuilt or else left with the ones that failed. The migration
+    refuses to start while that file exists, so it is never overwritten.
     """
     callback = progress_callback or _default_callback
-    migration_order = plan.get("migration_order", [])
+    if drop_indexes and index_backup_path and os.path.exists(index_backup_path):
+        raise FileExistsError(
+            f"'{index_backup_path}' lists indexes from a previous run that were not recreated. "
+            "Run it manually and delete it before dropping indexes again.")
+    planned_order = plan.get("migration_order", [])
+    # A label listed twice would be cleaned and copied twice.
+    migration_order = list(dict.fromkeys(planned_order))
+    if len(migration_order) != len(planned_order):
+        callback("WARNING", "Migration plan lists some models more than once. Duplicates are ignored.")
+    shared_labels = set(_get_shared_table_labels(migration_order))
+    if shared_labels:
+        migration_order = [
+            model_label for model_label in migration_order if model_label not in shared_labels]
+    migration_groups = _dedupe_groups([
+        [model_label for model_label in group if model_label not in shared_labels]
+        for group in plan.get("migration_groups") or [
+            [model_label] for model_label in migration_order
+        ]
+    ])
+    migration_groups, unknown_labels, ungrouped_labels = _align_groups(
+        migration_groups, migration_order)
+    if unknown_labels:
+        callback(
+            "WARNING", f"Migration groups list models missing from the migration order, which are ignored: {', '.join(unknown_labels)}")
+    if ungrouped_labels:
+        callback(
+            "WARNING", f"Migration groups omit some models, which are migrated last: {', '.join(ungrouped_labels)}")
+    max_workers = max_workers or os.cpu_count() or 1
 
     if not migration_order:
         callback("WARNING", "Migration plan is empty. Nothing to migrate.")
         return
 
+    resolved = _resolve_models(migration_order)
+    models_by_label = {model_label: model for model_label, model, *_ in resolved}
+    m2m_resolved = _resolve_models(_get_m2m_through_labels(
+        list(models_by_label.values()), plan.get("m2m_through_models", [])))
+
     with connections[destination_db_alias].cursor() as cursor:
         callback("INFO", "Disabling triggers and foreign keys on destination DB...")
         cursor.execute("SET session_replication_role = 'replica';")
 
         callback("INFO", "--- PHASE 1: Cleaning destination tables... ---")
-        for model_label in reversed(migration_order):
-            try:
-                model = apps.get_model(model_label)
-                table_name = model._meta.db_table
-                callback("INFO", f"Cleaning table: {table_name}")
-                cursor.execute(
-                    f'TRUNCATE TABLE "{table_name}" RESTART IDENTITY CASCADE;')
-            except UNDEFINED_TABLE_ERROR:
+        existing_tables = set(
+            connections[destination_db_alias].introspection.table_names(cursor))
+        tables_to_clean = []
+        for _, _, table_name, _, _ in reversed(resolved):
+            if table_name in existing_tables:
+                tables_to_clean.append(table_name)
+            else:
                 callback(
                     "WARNING", f"Table '{table_name}' not found. Skipping cleanup.")
+
+        if tables_to_clean:
+            callback("INFO", f"Cleaning {len(tables_to_clean)} tables...")
+            try:
+                table_list = ", ".join(f'"{table_name}"' for table_name in tables_to_clean)
+                cursor.execute(
+                    f"TRUNCATE TABLE {table_list} RESTART IDENTITY CASCADE;")
             except Exception as e:
                 callback(
-                    "ERROR", f"Unexpected error cleaning {table_name}: {e}")
+                    "ERROR", f"Unexpected error cleaning destination tables: {e}")
                 cursor.execute("SET session_replication_role = 'origin';")
                 raise
 
-        callback("INFO", "\n--- PHASE 2: Migrating model data... ---")
-        migrated_models_classes = []
-        for model_label in migration_order:
-            model = apps.get_model(model_label)
-            migrated_models_classes.append(model)
+        unlogged_tables = []
+        if unlogged:
+            # Referencing tables must become UNLOGGED before the tables they
+            # point to, and LOGGED again after them. M2M through tables
+            # reference the models on both sides, so they go first.
+            callback("INFO", "Setting destination tables UNLOGGED during the load...")
+            unlogged_tables = _set_tables_logged(
+                cursor,
+                list(dict.fromkeys(
+                    [table_name for _, _, table_name, _, _ in m2m_resolved
+                     if table_name in existing_tables] + tables_to_clean)),
+                False, callback)
 
-            callback(
-                "INFO", f"\nMigrating {model._meta.verbose_name_plural}...")
-
-            # --- FINAL ROBUST LOGIC TO PRESERVE TIMESTAMPS ---
-            original_states = {}
-            for field in model._meta.get_fields():
-                if not field.concrete or field.is_relation:
-                    continue
-
-                if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
-                    original_states[field.name] = {
-                        "auto_now": field.auto_now,
-                        "auto_now_add": field.auto_now_add,
-                    }
-                    field.auto_now = False
-                    field.auto_now_add = False
+        dropped_indexes = []
+        try:
+            if drop_indexes:
+                _drop_secondary_indexes(
+                    cursor, [table_name for _, _, table_name, _, _ in resolved],
+                    dropped_indexes, index_backup_path)
+                callback(
+                    "INFO", f"Dropped {len(dropped_indexes)} secondary indexes until the data is loaded.")
 
-            try:
-                source_items = list(model.objects.using(source_db_alias).all())
-                count = len(source_items)
+            callback("INFO", "\n--- PHASE 2: Migrating model data... ---")
+            for group in migration_groups:
+                group_models = [models_by_label[model_label] for model_label in group]
 
-                if count == 0:
-                    callback("INFO", "No items to migrate.")
-                    continue
+                workers = max(1, min(len(group_models), max_workers))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(
+                            _migrate_model, model, source_db_alias,
+                            destination_db_alias, callback, insert_mode)
+                        for model in group_models
+                    ]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except Exception:
+                        for future in futures:
+                            future.cancel()
+                        cursor.execute("SET session_replication_role = 'origin';")
+                        raise
 
-                callback(
-                    "INFO", f"Found {count} items. Inserting into destination...")
-                model.objects.using(destination_db_alias).bulk_create(
-                    source_items, batch_size=1000)
-                callback("SUCCESS", "Success!")
-            except Exception as e:
-                if ("1146" in str(e)) or ("UndefinedTable" in str(e.__class__.__name__)):
-                    callback(
-                        "WARNING", f"Table for '{model_label}' not found. Skipping.")
-                else:
-                    callback(
-                        "ERROR", f"Error during data migration for {model_label}: {e}")
-                    cursor.execute("SET session_replication_role = 'origin';")
-                    raise
-            finally:
-                if original_states:
-                    for field in model._meta.get_fields():
-                        if field.name in original_states:
-                            field.auto_now = original_states[field.name]['auto_now']
-                            field.auto_now_add = original_states[field.name]['auto_now_add']
-
-        callback("INFO", "\n--- PHASE 3: Migrating ManyToMany relationships... ---")
-        m2m_model_labels = plan.get("m2m_through_models", [])
-        if not m2m_model_labels:
-            callback("INFO", "No custom ManyToMany models to migrate.")
-        else:
-            for model_label in m2m_model_labels:
-                callback("INFO", f"\nProcessing M2M table: {model_label}")
-                try:
-                    m2m_model = apps.get_model(model_label)
-                    m2m_relations = list(
-                        m2m_model.objects.using(source_db_alias).all())
-                    if m2m_relations:
-                        m2m_model.objects.using(destination_db_alias).bulk_create(
-                            m2m_relations, batch_size=2000
-                        )
-                        callback(
-                            "SUCCESS", f"Success: {len(m2m_relations)} relationships migrated for {model_label}.")
-                    else:
+            callback("INFO", "\n--- PHASE 3: Migrating ManyToMany relationships... ---")
+            if not m2m_resolved:
+                callback("INFO", "No ManyToMany tables to migrate.")
+            else:
+                for model_label, m2m_model, _, _, _ in m2m_resolved:
+                    callback("INFO", f"\nProcessing M2M table: {model_label}")
+                    try:
+                        count = _load_model_data(
+                            cursor, m2m_model, source_db_alias, insert_mode)
+                        if count:
+                            callback(
+                                "SUCCESS", f"Success: {count} relationships migrated for {model_label}.")
+                        else:
+                            callback(
+                                "INFO", f"No relationships to migrate for {model_label}.")
+                    except Exception as e:
                         callback(
-                            "INFO", f"No relationships to migrate for {model_label}.")
-                except Exception as e:
+                            "WARNING", f"Could not migrate M2M for {model_label}: {e}")
+        finally:
+            # SET LOGGED rewrites each table with its indexes, so it runs
+            # before the dropped indexes are rebuilt, not after.
+            if unlogged_tables:
+                callback("INFO", "Setting destination tables LOGGED again...")
+                _set_tables_logged(
+                    cursor, list(reversed(unlogged_tables)), True, callback)
+            if dropped_indexes:
+                callback("INFO", f"Recreating {len(dropped_indexes)} secondary indexes...")
+                failed_indexes = _recreate_indexes(cursor, dropped_indexes, callback)
+                if index_backup_path and failed_indexes:
+                    # Keep only what still has to be run by hand.
+                    with open(index_backup_path, "w", encoding="utf-8") as backup_file:
+                        backup_file.writelines(
+                            f"{index_definition};\n" for index_definition in failed_indexes)
                     callback(
-                        "WARNING", f"Could not migrate M2M for {model_label}: {e}")
+                        "ERROR", f"Indexes that could not be recreated are listed in {index_backup_path}.")
+                elif index_backup_path:
+                    os.remove(index_backup_path)
 
         callback(
             "INFO", "\n--- Finalizing: Re-enabling triggers and resetting sequences... ---")
         cursor.execute("SET session_replication_role = 'origin';")
-        for model in migrated_models_classes:
+        sequence_resets = [
+            f"""SELECT setval(pg_get_serial_sequence('"{table_name}"', '{pk_name}'), COALESCE(MAX("{pk_name}"), 1), MAX("{pk_name}") IS NOT NULL) FROM "{table_name}";"""
+            for _, _, table_name, pk_name, is_auto_pk in resolved + m2m_resolved
+            if is_auto_pk
+        ]
+        if sequence_resets:
             try:
-                table_name = model._meta.db_table
-                pk_name = model._meta.pk.name
-                if isinstance(model._meta.pk, (models.AutoField, models.BigAutoField)):
-                    sql = f"""SELECT setval(pg_get_serial_sequence('"{table_name}"', '{pk_name}'), COALESCE(MAX("{pk_name}"), 1), MAX("{pk_name}") IS NOT NULL) FROM "{table_name}";"""
-                    cursor.execute(sql)
+                cursor.execute("\n".join(sequence_resets))
             except (Exception, UNDEFINED_TABLE_ERROR):
-                pass
+                # One missing table fails the whole batch; retry one by one
+                # so the remaining sequences are still reset.
+                for sql in sequence_resets:
+                    try:
+                        cursor.execute(sql)
+                    except (Exception, UNDEFINED_TABLE_ERROR):
+                        pass
     callback("SUCCESS", "\n\nMigration process completed successfully!")